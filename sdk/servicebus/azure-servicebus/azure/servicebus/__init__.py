@@ -9,7 +9,7 @@ from ._version import VERSION
 __version__ = VERSION
 
 from ._servicebus_client import ServiceBusClient
-from ._servicebus_sender import ServiceBusSender
+from ._servicebus_sender import ServiceBusSender, ServiceBusSenderPool
 from ._servicebus_receiver import ServiceBusReceiver
 from ._servicebus_session_receiver import ServiceBusSessionReceiver
 from ._servicebus_session import ServiceBusSession
@@ -32,6 +32,7 @@ __all__ = [
     'ServiceBusSessionReceiver',
     'ServiceBusSession',
     'ServiceBusSender',
+    'ServiceBusSenderPool',
     'ServiceBusSharedKeyCredential',
     'TransportType',
     'AutoLockRenew'
@@ -4,8 +4,10 @@
 # --------------------------------------------------------------------------------------------
 import collections
 import logging
+import threading
 import uuid
 import time
+import weakref
 from datetime import timedelta
 from typing import cast, Optional, Tuple, TYPE_CHECKING, Dict, Any, Callable, Type
 
@@ -39,8 +41,56 @@ if TYPE_CHECKING:
 _AccessToken = collections.namedtuple("AccessToken", "token expires_on")
 _LOGGER = logging.getLogger(__name__)
 
+# Minimum remaining lifetime in seconds for a cached token to be handed out again.
+_TOKEN_REFRESH_SKEW = 300
+_TOKEN_CACHES = weakref.WeakKeyDictionary()  # type: weakref.WeakKeyDictionary
+_TOKEN_CACHES_LOCK = threading.Lock()
+
+
+class _LRUCache(object):
+    """A thread-safe mapping holding the `maxsize` most recently used items."""
+
+    def __init__(self, maxsize):
+        # type: (int) -> None
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+        self._items = collections.OrderedDict()  # type: collections.OrderedDict
+
+    def get_or_create(self, key, factory):
+        # type: (Any, Callable[[], Any]) -> Any
+        with self._lock:
+            value = self._items.pop(key, None)
+            if value is not None:
+                self._items[key] = value  # re-insert as the most recently used
+                return value
+        value = factory()
+        with self._lock:
+            value = self._items.setdefault(key, value)
+            while len(self._items) > self._maxsize:
+                self._items.popitem(last=False)
+        return value
+
+
+# Note that these caches keep the shared access keys of the most recently used connection strings
+# resident in memory for the lifetime of the process.
+_PARSED_CONN_STRS = _LRUCache(32)
+_SHARED_KEY_CREDENTIALS = _LRUCache(32)
+
 
 def _parse_conn_str(conn_str):
+    # type: (str) -> Tuple[str, str, str, str]
+    return _PARSED_CONN_STRS.get_or_create(conn_str, lambda: _parse_conn_str_uncached(conn_str))
+
+
+def _get_shared_key_credential(credential_type, policy, key):
+    # type: (Type, str, str) -> Any
+    """Get a credential of the given shared key credential type, reusing the instance created for the same key."""
+    return _SHARED_KEY_CREDENTIALS.get_or_create(
+        (credential_type, policy, key), lambda: credential_type(policy, key)
+    )
+
+
+def _parse_conn_str_uncached(conn_str):
     # type: (str) -> Tuple[str, str, str, str]
     endpoint = None
     shared_access_key_name = None
@@ -111,7 +161,7 @@ def _convert_connection_string_to_kwargs(conn_str, shared_key_credential_type, *
 
     kwargs["fully_qualified_namespace"] = host
     kwargs["entity_name"] = entity_in_conn_str or entity_in_kwargs
-    kwargs["credential"] = shared_key_credential_type(policy, key)
+    kwargs["credential"] = _get_shared_key_credential(shared_key_credential_type, policy, key)
     return kwargs
 
 
@@ -135,6 +185,67 @@ class ServiceBusSharedKeyCredential(object):
         return _generate_sas_token(scopes[0], self.policy, self.key)
 
 
+def _get_token_cache(credential):
+    # type: (Any) -> Tuple[Any, Dict[Tuple[str, ...], Tuple[Any, float]]]
+    """Get the lock and token dict shared by every client using the given credential object."""
+    with _TOKEN_CACHES_LOCK:
+        try:
+            return _TOKEN_CACHES.setdefault(credential, (threading.Lock(), {}))
+        except TypeError:  # the credential cannot be weak referenced, cache per client instead
+            return threading.Lock(), {}
+
+
+def _get_token_refresh_time(expires_on):
+    # type: (float) -> float
+    # Stop reusing a token well before uamqp's refresh window (10% of the remaining lifetime when the
+    # token is put) opens, so that a refresh always receives a new token rather than the cached one.
+    now = time.time()
+    return expires_on - max(_TOKEN_REFRESH_SKEW, (expires_on - now) * 0.2)
+
+
+class _CachingTokenCredential(object):
+    """Wraps a token credential so that its tokens are reused until they are close to expiry.
+
+    The cache is shared by all clients using the same credential object, which saves credentials
+    such as `AzureCliCredential` from acquiring a new token each time a client is opened.
+
+    :param credential: The credential object implementing `get_token(self, *scopes)` to wrap.
+    """
+
+    def __init__(self, credential):
+        # type: (TokenCredential) -> None
+        self._credential = credential
+        self._lock, self._tokens = _get_token_cache(credential)
+
+    def __getattr__(self, name):
+        return getattr(self._credential, name)
+
+    def __eq__(self, other):
+        if isinstance(other, _CachingTokenCredential):
+            return self._credential is other._credential
+        return NotImplemented
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(id(self._credential))
+
+    def get_token(self, *scopes, **kwargs):
+        # type: (str, Any) -> _AccessToken
+        if kwargs:
+            return self._credential.get_token(*scopes, **kwargs)
+        with self._lock:
+            cached = self._tokens.get(scopes)
+        if cached is not None and time.time() < cached[1]:
+            return cached[0]
+        # Fetch outside of the lock, a slow credential must not block the clients reading other scopes.
+        token = self._credential.get_token(*scopes)
+        with self._lock:
+            self._tokens[scopes] = (token, _get_token_refresh_time(token.expires_on))
+        return token
+
+
 class BaseHandler:  # pylint:disable=too-many-instance-attributes
     def __init__(
         self,
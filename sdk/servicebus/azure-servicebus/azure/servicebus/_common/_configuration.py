@@ -8,6 +8,21 @@ from uamqp.constants import TransportType
 
 
 class Configuration(object):  # pylint:disable=too-many-instance-attributes
+    __slots__ = (
+        "user_agent",
+        "retry_total",
+        "retry_backoff_factor",
+        "retry_backoff_max",
+        "logging_enable",
+        "http_proxy",
+        "transport_type",
+        "auth_timeout",
+        "encoding",
+        "auto_reconnect",
+        "connection_idle_timeout",
+        "pre_ping",
+    )
+
     def __init__(self, **kwargs):
         self.user_agent = kwargs.get("user_agent")  # type: Optional[str]
         self.retry_total = kwargs.get("retry_total", 3)  # type: int
@@ -23,3 +38,5 @@ class Configuration(object):  # pylint:disable=too-many-instance-attributes
         self.auth_timeout = kwargs.get("auth_timeout", 60)  # type: int
         self.encoding = kwargs.get("encoding", "UTF-8")
         self.auto_reconnect = kwargs.get("auto_reconnect", True)
+        self.connection_idle_timeout = kwargs.get("connection_idle_timeout")  # type: Optional[float]
+        self.pre_ping = kwargs.get("pre_ping", False)  # type: bool
@@ -0,0 +1,111 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Tuple
+
+from .utils import is_connection_alive
+
+
+class _ConnectionPool(object):
+    """A registry of shared uamqp connections.
+
+    Connections are reference counted by the clients holding them. A connection released by every client
+    is kept idle so that a later client with the same key can reuse it without a new handshake; the least
+    recently used idle connections beyond `max_idle` are evicted. Nothing drives an idle connection, so a close
+    by the service goes unnoticed: an idle connection is only handed out again if it is still alive and has been
+    idle for less than `max_idle_time`. The pool never destroys a connection itself, connections to destroy are
+    handed back to the caller, so the same pool works for sync and async connections.
+
+    :param int max_idle: The maximum number of idle connections kept open for reuse.
+    :param float max_idle_time: The time in seconds after which an idle connection is no longer reused.
+     The default stays below the 4 minutes after which Azure load balancers drop idle TCP connections.
+    """
+
+    def __init__(self, max_idle=4, max_idle_time=200):
+        # type: (int, float) -> None
+        self._max_idle = max_idle
+        self._max_idle_time = max_idle_time
+        self._lock = threading.Lock()
+        self._connections = OrderedDict()  # type: OrderedDict
+        # Broken connections dropped from the pool while clients still hold them, by id.
+        self._retired = {}  # type: dict
+
+    def acquire(self, key):
+        # type: (Hashable) -> Tuple[Optional[Any], List[Any]]
+        """Take a reference on the pooled connection for the key.
+
+        Returns the connection, or None if there is no usable one, and the stale connections dropped from
+        the pool which the caller is responsible for destroying.
+        """
+        with self._lock:
+            entry = self._connections.pop(key, None)
+            if entry is None:
+                return None, []
+            connection, refcount, idle_since = entry
+            if refcount <= 0 and time.time() - idle_since > self._max_idle_time:
+                return None, [connection]
+            if not is_connection_alive(connection):
+                if refcount <= 0:
+                    return None, [connection]
+                self._retired[id(connection)] = [connection, refcount]
+                return None, []
+            entry[1] += 1
+            self._connections[key] = entry  # re-insert as the most recently used
+            return connection, []
+
+    def add(self, key, connection):
+        # type: (Hashable, Any) -> Any
+        """Register a newly created connection and take a reference on it.
+
+        If another client registered a connection for the same key in the meantime, that connection is
+        returned instead and the caller is responsible for destroying the one it created.
+        """
+        with self._lock:
+            entry = self._connections.pop(key, None)
+            if entry is None:
+                entry = [connection, 0, None]
+            entry[1] += 1
+            self._connections[key] = entry
+            return entry[0]
+
+    def remove(self, key, connection):
+        # type: (Hashable, Any) -> None
+        """Stop handing out a connection, e.g. because it is broken. The caller is responsible for destroying it."""
+        with self._lock:
+            entry = self._connections.get(key)
+            if entry is not None and entry[0] is connection:
+                del self._connections[key]
+            self._retired.pop(id(connection), None)
+
+    def release(self, key, connection):
+        # type: (Hashable, Any) -> List[Any]
+        """Drop a reference on the connection and return the connections which should be destroyed."""
+        with self._lock:
+            discarded = []
+            entry = self._connections.get(key)
+            if entry is not None and entry[0] is connection:
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    entry[2] = time.time()
+            else:
+                retired = self._retired.get(id(connection))
+                if retired is not None and retired[0] is connection:
+                    retired[1] -= 1
+                    if retired[1] <= 0:
+                        del self._retired[id(connection)]
+                        discarded.append(connection)
+            idle_keys = [k for k, pooled in self._connections.items() if pooled[1] <= 0]
+            evicted_keys = idle_keys[:max(len(idle_keys) - self._max_idle, 0)]
+            discarded.extend(self._connections.pop(k)[0] for k in evicted_keys)
+            return discarded
+
+    def drain_idle(self):
+        # type: () -> List[Any]
+        """Drop every idle connection from the pool and return them, the caller is responsible for destroying them."""
+        with self._lock:
+            idle_keys = [k for k, pooled in self._connections.items() if pooled[1] <= 0]
+            return [self._connections.pop(k)[0] for k in idle_keys]
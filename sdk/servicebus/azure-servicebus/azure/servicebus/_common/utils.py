@@ -16,7 +16,12 @@ except ImportError:
     from urllib.parse import urlparse
 from concurrent.futures import ThreadPoolExecutor
 
-from uamqp import authentication
+from typing import Optional, TYPE_CHECKING
+
+from uamqp import authentication, c_uamqp
+
+if TYPE_CHECKING:
+    from uamqp import Connection
 
 from ..exceptions import AutoLockRenewFailed, AutoLockRenewTimeout, ServiceBusError
 from .._version import VERSION as sdk_version
@@ -143,6 +148,44 @@ def create_authentication(client):
     )
 
 
+_CLOSED_CONNECTION_STATES = (
+    c_uamqp.ConnectionState.CLOSE_PIPE,
+    c_uamqp.ConnectionState.CLOSE_RCVD,
+    c_uamqp.ConnectionState.CLOSE_SENT,
+    c_uamqp.ConnectionState.DISCARDING,
+    c_uamqp.ConnectionState.END,
+    c_uamqp.ConnectionState.ERROR,
+)
+
+
+def is_connection_alive(connection):
+    # type: (Optional[Connection]) -> bool
+    """Whether the connection has neither been closed nor failed.
+
+    uamqp only updates the state of a connection while the connection is worked, so this reflects the last
+    time it was worked. Use `ping_connection` to process a close by the service first.
+    """
+    # pylint: disable=protected-access
+    if connection is None or connection._closing or connection._error:
+        return False
+    return connection._state not in _CLOSED_CONNECTION_STATES
+
+
+def ping_connection(connection):
+    # type: (Connection) -> bool
+    """Work the connection once and return whether it is alive.
+
+    Working the connection processes what was received since it was last worked, such as a close by the
+    service, and closes it if its idle timeout has expired. It does not wait for the service.
+    """
+    try:
+        connection.work()
+    except Exception:  # pylint: disable=broad-except
+        # The connection raises the error it failed with.
+        return False
+    return is_connection_alive(connection)
+
+
 def generate_dead_letter_entity_name(
         queue_name=None,
         topic_name=None,
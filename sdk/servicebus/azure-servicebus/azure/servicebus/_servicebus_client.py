@@ -2,20 +2,81 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
-from typing import Any, TYPE_CHECKING
+import atexit
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, List, Sequence, TYPE_CHECKING
 
 import uamqp
-
-from ._base_handler import _parse_conn_str, ServiceBusSharedKeyCredential
-from ._servicebus_sender import ServiceBusSender
+from uamqp import c_uamqp
+
+from ._base_handler import (
+    _parse_conn_str,
+    _get_shared_key_credential,
+    ServiceBusSharedKeyCredential,
+    _CachingTokenCredential
+)
+from ._servicebus_sender import ServiceBusSender, ServiceBusSenderPool
 from ._servicebus_receiver import ServiceBusReceiver
 from ._servicebus_session_receiver import ServiceBusSessionReceiver
 from ._common._configuration import Configuration
-from ._common.utils import create_authentication, generate_dead_letter_entity_name
+from ._common._connection_pool import _ConnectionPool
+from ._common.constants import JWT_TOKEN_SCOPE, TOKEN_TYPE_JWT
+from ._common.utils import (
+    create_authentication,
+    generate_dead_letter_entity_name,
+    is_connection_alive,
+    ping_connection
+)
+from .exceptions import ServiceBusConnectionError
 
 if TYPE_CHECKING:
     from azure.core.credentials import TokenCredential
 
+_CONNECTION_POOL = _ConnectionPool()
+_TOKEN_PREFETCH_EXECUTOR = ThreadPoolExecutor(max_workers=1)
+
+
+def _destroy_idle_connections():
+    # Idle pooled connections are otherwise only collected during interpreter shutdown, when uamqp can no longer
+    # run their callbacks and logs "Can't call on_connection_state_changed during garbage collection".
+    for connection in _CONNECTION_POOL.drain_idle():
+        connection.destroy()
+
+
+atexit.register(_destroy_idle_connections)
+
+
+class _DedicatedConnections(object):
+    """The client holds no connection, every sender and receiver opens its own."""
+
+    @staticmethod
+    def acquire(client):
+        pass
+
+    @staticmethod
+    def release(client):
+        pass
+
+
+class _SharedConnection(object):
+    """The client holds a pooled connection which all of its senders and receivers are bound to."""
+
+    @staticmethod
+    def acquire(client):
+        # pylint: disable=protected-access
+        client._pre_ping_connection()
+        if not client._connection:
+            client._create_uamqp_connection()
+
+    @staticmethod
+    def release(client):
+        # pylint: disable=protected-access
+        if client._connection:
+            for connection in _CONNECTION_POOL.release(client._connection_pool_key, client._connection):
+                connection.destroy()
+            client._connection = None
+
 
 class ServiceBusClient(object):
     """The ServiceBusClient class defines a high level interface for
@@ -40,6 +101,12 @@ class ServiceBusClient(object):
     :keyword dict http_proxy: HTTP proxy settings. This must be a dictionary with the following
      keys: `'proxy_hostname'` (str value) and `'proxy_port'` (int value).
      Additionally the following keys may also be present: `'username', 'password'`.
+    :keyword float connection_idle_timeout: The time in seconds after which the shared connection is considered
+     broken if nothing was received on it. The service sends empty frames on an idle connection to honor it,
+     so a connection dropped without a close, which TCP alone would not notice, is closed once this time has
+     passed and `is_alive` returns False from then on. Default is None, meaning no timeout.
+    :keyword bool pre_ping: Whether to check that the shared connection is still alive before binding a new sender
+     or receiver to it, and replace it if it is not. Default is `False`.
 
     .. admonition:: Example:
 
@@ -51,6 +118,18 @@ class ServiceBusClient(object):
             :caption: Create a new instance of the ServiceBusClient.
 
     """
+    __slots__ = (
+        "fully_qualified_namespace",
+        "_credential",
+        "_entity_name",
+        "_config",
+        "_connection",
+        "_auth_uri",
+        "_connection_pool_key",
+        "_connection_strategy",
+        "__weakref__",
+    )
+
     def __init__(
         self,
         fully_qualified_namespace,
@@ -59,41 +138,169 @@ class ServiceBusClient(object):
     ):
         # type: (str, TokenCredential, Any) -> None
         self.fully_qualified_namespace = fully_qualified_namespace
-        self._credential = credential
+        self._credential = credential if isinstance(credential, ServiceBusSharedKeyCredential) \
+            else _CachingTokenCredential(credential)
+        self._entity_name = kwargs.pop("entity_name", None)
         self._config = Configuration(**kwargs)
         self._connection = None
-        self._entity_name = kwargs.get("entity_name")
-        self._auth_uri = "sb://{}".format(self.fully_qualified_namespace)
-        if self._entity_name:
-            self._auth_uri = "{}/{}".format(self._auth_uri, self._entity_name)
-        # Internal flag for switching whether to apply connection sharing, pending fix in uamqp library
-        self._connection_sharing = False
+        self._auth_uri = "sb://" + self.fully_qualified_namespace + \
+            ("/" + self._entity_name if self._entity_name else "")
+        # The key holds every setting applied to the connection. The credential is part of it so that a
+        # connection is never shared across identities.
+        http_proxy = self._config.http_proxy
+        self._connection_pool_key = (
+            self._auth_uri,
+            self._config.transport_type,
+            frozenset(http_proxy.items()) if http_proxy else None,
+            self._config.connection_idle_timeout,
+            self._config.logging_enable,
+            self._credential
+        )
+        # Connections are not shared by default, pending fix in uamqp library
+        self._connection_strategy = _DedicatedConnections
 
     def __enter__(self):
-        if self._connection_sharing:
-            self._create_uamqp_connection()
+        self._connection_strategy.acquire(self)
         return self
 
     def __exit__(self, *args):
         self.close()
 
     def _create_uamqp_connection(self):
-        auth = create_authentication(self)
-        self._connection = uamqp.Connection(
-            hostname=self.fully_qualified_namespace,
-            sasl=auth,
-            debug=self._config.logging_enable
-        )
+        connection, stale_connections = _CONNECTION_POOL.acquire(self._connection_pool_key)
+        for stale_connection in stale_connections:
+            stale_connection.destroy()
+        if connection is None:
+            auth = create_authentication(self)
+            idle_timeout = self._config.connection_idle_timeout
+            new_connection = uamqp.Connection(
+                hostname=self.fully_qualified_namespace,
+                sasl=auth,
+                idle_timeout=int(idle_timeout * 1000) if idle_timeout else None,
+                debug=self._config.logging_enable
+            )
+            connection = _CONNECTION_POOL.add(self._connection_pool_key, new_connection)
+            if connection is not new_connection:
+                new_connection.destroy()
+        self._connection = connection
+
+    def is_alive(self):
+        # type: () -> bool
+        """Whether the shared connection of the client is usable.
+
+        This only applies to a client sharing its connection, e.g. one created with `open`. The connection
+        is worked once, without waiting for the service, so that a close by the service received since it was
+        last used is noticed; a connection dropped without a close is only noticed once `connection_idle_timeout`
+        has passed. It returns False if the client holds no shared connection, which is always the case for a
+        client whose senders and receivers open their own connections, or if the shared connection has been
+        closed or has failed, in which case a new client should be created.
+
+        :rtype: bool
+        """
+        return self._connection is not None and ping_connection(self._connection)
+
+    def _discard_uamqp_connection(self):
+        _CONNECTION_POOL.remove(self._connection_pool_key, self._connection)
+        self._connection.destroy()
+        self._connection = None
+
+    def _pre_ping_connection(self):
+        if self._config.pre_ping and self._connection and not self.is_alive():
+            self._discard_uamqp_connection()
+            self._create_uamqp_connection()
+
+    def _prefetch_token(self):
+        # A JWT is only requested once the CBS link is attached, after the handshake. Fetching it on a
+        # worker thread while the handshake runs warms the token cache, so the two round trips overlap.
+        # pylint: disable=protected-access
+        if self._connection._state == c_uamqp.ConnectionState.OPENED or \
+                not isinstance(self._credential, _CachingTokenCredential) or \
+                getattr(self._credential, "token_type", TOKEN_TYPE_JWT) != TOKEN_TYPE_JWT:
+            return None
+        return _TOKEN_PREFETCH_EXECUTOR.submit(self._credential.get_token, JWT_TOKEN_SCOPE)
+
+    def _open_uamqp_connection(self):
+        # uamqp only opens a connection when the first link on it begins, so drive the handshake here.
+        # pylint: disable=protected-access
+        connection = self._connection
+        error_message = "Failed to open the connection to {}.".format(self.fully_qualified_namespace)
+        deadline = time.time() + self._config.auth_timeout
+        token_future = self._prefetch_token()
+        try:
+            connection._conn.open()
+        except ValueError as e:
+            raise ServiceBusConnectionError(error_message, e)
+        while connection._state != c_uamqp.ConnectionState.OPENED:
+            if connection._state in (c_uamqp.ConnectionState.END, c_uamqp.ConnectionState.ERROR) \
+                    or time.time() > deadline:
+                raise ServiceBusConnectionError(error_message)
+            connection.work()
+            time.sleep(0.01)
+        if token_future is not None:
+            try:
+                token_future.result(timeout=max(deadline - time.time(), 0))
+            except FutureTimeoutError:
+                raise ServiceBusConnectionError(error_message)
 
     def close(self):
         # type: () -> None
         """
-        Close down the ServiceBus client and the underlying connection.
+        Close down the ServiceBus client and release the underlying connection.
+
+        A shared connection is only destroyed once no other client is using it.
 
         :return: None
         """
-        if self._connection_sharing and self._connection:
-            self._connection.destroy()
+        self._connection_strategy.release(self)
+
+    @classmethod
+    def open(
+        cls,
+        fully_qualified_namespace,
+        credential,
+        **kwargs
+    ):
+        # type: (str, TokenCredential, Any) -> ServiceBusClient
+        """
+        Create a ServiceBusClient and open its shared connection before returning.
+
+        The senders and receivers got from the client are bound to this connection, so the connection
+        handshake is paid up front rather than on the first send or receive. The returned client
+        should be closed once it is no longer needed.
+
+        :param str fully_qualified_namespace: The fully qualified host name for the Service Bus namespace.
+         The namespace format is: `<yournamespace>.servicebus.windows.net`.
+        :param ~azure.core.credentials.TokenCredential credential: The credential object used for authentication
+         which implements a particular interface for getting tokens.
+        :keyword str entity_name: Optional entity name, this can be the name of Queue or Topic.
+         It must be specified if the credential is for specific Queue or Topic.
+        :keyword bool logging_enable: Whether to output network trace logs to the logger. Default is `False`.
+        :keyword transport_type: The type of transport protocol that will be used for communicating with
+         the Service Bus service. Default is `TransportType.Amqp`.
+        :paramtype transport_type: ~azure.servicebus.TransportType
+        :keyword dict http_proxy: HTTP proxy settings. This must be a dictionary with the following
+         keys: `'proxy_hostname'` (str value) and `'proxy_port'` (int value).
+         Additionally the following keys may also be present: `'username', 'password'`.
+        :keyword int auth_timeout: The time in seconds to wait for the connection to be opened. Default is 60.
+        :rtype: ~azure.servicebus.ServiceBusClient
+        :raises: ~azure.servicebus.exceptions.ServiceBusConnectionError if the connection could not be opened.
+        """
+        client = cls(fully_qualified_namespace, credential, **kwargs)
+        # pylint: disable=protected-access
+        client._connection_strategy = _SharedConnection
+        was_open = False
+        try:
+            _SharedConnection.acquire(client)
+            was_open = client._connection._state == c_uamqp.ConnectionState.OPENED
+            client._open_uamqp_connection()
+        except Exception:
+            # Only keep a pooled connection which was open before, other clients are using it. Any other one,
+            # e.g. a connection stuck in its handshake, is discarded so that it is not handed out again.
+            if client._connection and not (was_open and is_connection_alive(client._connection)):
+                client._discard_uamqp_connection()
+            _SharedConnection.release(client)
+            raise
+        return client
 
     @classmethod
     def from_connection_string(
@@ -131,7 +338,7 @@ class ServiceBusClient(object):
         return cls(
             fully_qualified_namespace=host,
             entity_name=entity_in_conn_str or kwargs.pop("entity_name", None),
-            credential=ServiceBusSharedKeyCredential(policy, key),  # type: ignore
+            credential=_get_shared_key_credential(ServiceBusSharedKeyCredential, policy, key),
             **kwargs
         )
 
@@ -155,6 +362,7 @@ class ServiceBusClient(object):
 
         """
         # pylint: disable=protected-access
+        self._pre_ping_connection()
         return ServiceBusSender(
             fully_qualified_namespace=self.fully_qualified_namespace,
             queue_name=queue_name,
@@ -166,6 +374,41 @@ class ServiceBusClient(object):
             **kwargs
         )
 
+    def get_queue_senders(self, queue_names, **kwargs):
+        # type: (Sequence[str], Any) -> List[ServiceBusSender]
+        """Get ServiceBusSenders for multiple queues which share the connection of the client.
+
+        Connection sharing is turned on for the client and its connection is created if needed, so that
+        the connection handshake is done once for all of the queues.
+
+        :param list[str] queue_names: The paths of the Service Bus Queues to get senders for.
+        :keyword int retry_total: The total number of attempts to redo a failed operation when an error occurs.
+         Default value is 3.
+        :rtype: list[~azure.servicebus.ServiceBusSender]
+        """
+        self._connection_strategy = _SharedConnection
+        _SharedConnection.acquire(self)
+        return [self.get_queue_sender(queue_name, **kwargs) for queue_name in queue_names]
+
+    def get_queue_sender_pool(self, queue_name, size=8, **kwargs):
+        # type: (str, int, Any) -> ServiceBusSenderPool
+        """Get a pool of ServiceBusSenders for the specific queue which share the connection of the client.
+
+        Connection sharing is turned on for the client and its connection is created if needed, so that
+        concurrent producers can send over multiple links without opening a new connection per sender.
+
+        :param str queue_name: The path of specific Service Bus Queue the client connects to.
+        :param int size: The number of senders in the pool. Default value is 8.
+        :keyword int retry_total: The total number of attempts to redo a failed operation when an error occurs.
+         Default value is 3.
+        :rtype: ~azure.servicebus.ServiceBusSenderPool
+        """
+        if size < 1:
+            raise ValueError("The size of a sender pool must be at least 1.")
+        self._connection_strategy = _SharedConnection
+        _SharedConnection.acquire(self)
+        return ServiceBusSenderPool([self.get_queue_sender(queue_name, **kwargs) for _ in range(size)])
+
     def get_queue_receiver(self, queue_name, **kwargs):
         # type: (str, Any) -> ServiceBusReceiver
         """Get ServiceBusReceiver for the specific queue.
@@ -199,6 +442,7 @@ class ServiceBusClient(object):
 
         """
         # pylint: disable=protected-access
+        self._pre_ping_connection()
         return ServiceBusReceiver(
             fully_qualified_namespace=self.fully_qualified_namespace,
             queue_name=queue_name,
@@ -210,6 +454,29 @@ class ServiceBusClient(object):
             **kwargs
         )
 
+    def get_queue_receivers(self, queue_names, **kwargs):
+        # type: (Sequence[str], Any) -> List[ServiceBusReceiver]
+        """Get ServiceBusReceivers for multiple queues which share the connection of the client.
+
+        Connection sharing is turned on for the client and its connection is created if needed, so that
+        the connection handshake is done once for all of the queues.
+
+        :param list[str] queue_names: The paths of the Service Bus Queues to get receivers for.
+        :keyword mode: The mode with which messages will be retrieved from the entities. The default
+         mode is PeekLock.
+        :paramtype mode: ~azure.servicebus.ReceiveSettleMode
+        :keyword int prefetch: The maximum number of messages to cache with each request to the service.
+         The default value is 0.
+        :keyword float idle_timeout: The timeout in seconds between received messages after which the receivers
+         will automatically shutdown. The default value is 0, meaning no timeout.
+        :keyword int retry_total: The total number of attempts to redo a failed operation when an error occurs.
+         Default value is 3.
+        :rtype: list[~azure.servicebus.ServiceBusReceiver]
+        """
+        self._connection_strategy = _SharedConnection
+        _SharedConnection.acquire(self)
+        return [self.get_queue_receiver(queue_name, **kwargs) for queue_name in queue_names]
+
     def get_queue_deadletter_receiver(self, queue_name, **kwargs):
         # type: (str, Any) -> ServiceBusReceiver
         """Get ServiceBusReceiver for the dead-letter queue which is the secondary subqueue provided by
@@ -255,6 +522,7 @@ class ServiceBusClient(object):
             queue_name=queue_name,
             transfer_deadletter=kwargs.get('transfer_deadletter', False)
         )
+        self._pre_ping_connection()
         return ServiceBusReceiver(
             fully_qualified_namespace=self.fully_qualified_namespace,
             entity_name=entity_name,
@@ -289,6 +557,7 @@ class ServiceBusClient(object):
                 :caption: Create a new instance of the ServiceBusSender from ServiceBusClient.
 
         """
+        self._pre_ping_connection()
         return ServiceBusSender(
             fully_qualified_namespace=self.fully_qualified_namespace,
             topic_name=topic_name,
@@ -338,6 +607,7 @@ class ServiceBusClient(object):
 
         """
         # pylint: disable=protected-access
+        self._pre_ping_connection()
         return ServiceBusReceiver(
             fully_qualified_namespace=self.fully_qualified_namespace,
             topic_name=topic_name,
@@ -397,6 +667,7 @@ class ServiceBusClient(object):
             subscription_name=subscription_name,
             transfer_deadletter=kwargs.get('transfer_deadletter', False)
         )
+        self._pre_ping_connection()
         return ServiceBusReceiver(
             fully_qualified_namespace=self.fully_qualified_namespace,
             entity_name=entity_name,
@@ -450,6 +721,7 @@ class ServiceBusClient(object):
 
         """
         # pylint: disable=protected-access
+        self._pre_ping_connection()
         return ServiceBusSessionReceiver(
             fully_qualified_namespace=self.fully_qualified_namespace,
             topic_name=topic_name,
@@ -501,6 +773,7 @@ class ServiceBusClient(object):
 
         """
         # pylint: disable=protected-access
+        self._pre_ping_connection()
         return ServiceBusSessionReceiver(
             fully_qualified_namespace=self.fully_qualified_namespace,
             queue_name=queue_name,
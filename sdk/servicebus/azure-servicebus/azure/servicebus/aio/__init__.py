@@ -5,7 +5,7 @@
 # -------------------------------------------------------------------------
 from ._async_message import ReceivedMessage
 from ._base_handler_async import ServiceBusSharedKeyCredential
-from ._servicebus_sender_async import ServiceBusSender
+from ._servicebus_sender_async import ServiceBusSender, ServiceBusSenderPool
 from ._servicebus_receiver_async import ServiceBusReceiver
 from ._servicebus_session_receiver_async import ServiceBusSessionReceiver
 from ._servicebus_session_async import ServiceBusSession
@@ -16,6 +16,7 @@ __all__ = [
     'ReceivedMessage',
     'ServiceBusClient',
     'ServiceBusSender',
+    'ServiceBusSenderPool',
     'ServiceBusReceiver',
     'ServiceBusSessionReceiver',
     'ServiceBusSharedKeyCredential',
@@ -11,7 +11,7 @@ import functools
 
 from uamqp import authentication
 
-from .._common.utils import renewable_start_time, utc_now
+from .._common.utils import renewable_start_time, utc_now, is_connection_alive
 from ..exceptions import AutoLockRenewTimeout, AutoLockRenewFailed, ServiceBusError
 from .._common.constants import (
     JWT_TOKEN_SCOPE,
@@ -164,3 +164,13 @@ class AutoLockRenew:
         """Cancel remaining open lock renewal futures."""
         self._shutdown.set()
         await asyncio.wait(self._futures)
+
+
+async def ping_connection_async(connection):
+    """Work the connection once and return whether it is alive, see `ping_connection`."""
+    try:
+        await connection.work_async()
+    except Exception:  # pylint: disable=broad-except
+        # The connection raises the error it failed with.
+        return False
+    return is_connection_alive(connection)
@@ -4,12 +4,13 @@
 # --------------------------------------------------------------------------------------------
 import logging
 import asyncio
+import time
 import uuid
 from typing import TYPE_CHECKING, Any
 
 import uamqp
 from uamqp.message import MessageProperties
-from .._base_handler import _generate_sas_token
+from .._base_handler import _generate_sas_token, _get_token_cache, _get_token_refresh_time
 from .._common._configuration import Configuration
 from .._common.utils import create_properties
 from .._common.constants import (
@@ -46,6 +47,44 @@ class ServiceBusSharedKeyCredential(object):
         return _generate_sas_token(scopes[0], self.policy, self.key)
 
 
+class _CachingTokenCredential(object):
+    """Wraps an async token credential so that its tokens are reused until they are close to expiry.
+
+    The cache is shared by all clients using the same credential object.
+
+    :param credential: The credential object implementing `async get_token(self, *scopes)` to wrap.
+    """
+
+    def __init__(self, credential):
+        # type: (TokenCredential) -> None
+        self._credential = credential
+        _, self._tokens = _get_token_cache(credential)
+
+    def __getattr__(self, name):
+        return getattr(self._credential, name)
+
+    def __eq__(self, other):
+        if isinstance(other, _CachingTokenCredential):
+            return self._credential is other._credential
+        return NotImplemented
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(id(self._credential))
+
+    async def get_token(self, *scopes, **kwargs):
+        if kwargs:
+            return await self._credential.get_token(*scopes, **kwargs)
+        cached = self._tokens.get(scopes)
+        if cached is not None and time.time() < cached[1]:
+            return cached[0]
+        token = await self._credential.get_token(*scopes)
+        self._tokens[scopes] = (token, _get_token_refresh_time(token.expires_on))
+        return token
+
+
 class BaseHandler:
     def __init__(
         self,
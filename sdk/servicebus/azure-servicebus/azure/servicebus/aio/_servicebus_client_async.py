@@ -2,22 +2,83 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
-from typing import Any, TYPE_CHECKING
+import asyncio
+import atexit
+import time
+import weakref
+from typing import Any, List, Optional, Sequence, TYPE_CHECKING
 
 import uamqp
+from uamqp import c_uamqp
 
-from .._base_handler import _parse_conn_str
-from ._base_handler_async import ServiceBusSharedKeyCredential
-from ._servicebus_sender_async import ServiceBusSender
+from .._base_handler import _parse_conn_str, _get_shared_key_credential
+from ._base_handler_async import ServiceBusSharedKeyCredential, _CachingTokenCredential
+from ._servicebus_sender_async import ServiceBusSender, ServiceBusSenderPool
 from ._servicebus_receiver_async import ServiceBusReceiver
 from ._servicebus_session_receiver_async import ServiceBusSessionReceiver
 from .._common._configuration import Configuration
-from .._common.utils import generate_dead_letter_entity_name
-from ._async_utils import create_authentication
+from .._common._connection_pool import _ConnectionPool
+from .._common.constants import JWT_TOKEN_SCOPE, TOKEN_TYPE_JWT
+from .._common.utils import generate_dead_letter_entity_name, is_connection_alive
+from ._async_utils import create_authentication, ping_connection_async
+from ..exceptions import ServiceBusConnectionError
 
 if TYPE_CHECKING:
     from azure.core.credentials import TokenCredential
 
+# Async connections and their locks are bound to the event loop they were created on, so keep a pool per loop.
+_CONNECTION_POOLS = weakref.WeakKeyDictionary()  # type: weakref.WeakKeyDictionary
+
+
+def _get_connection_pool():
+    # type: () -> _ConnectionPool
+    loop = asyncio.get_event_loop()
+    try:
+        return _CONNECTION_POOLS[loop]
+    except KeyError:
+        return _CONNECTION_POOLS.setdefault(loop, _ConnectionPool())
+
+
+def _destroy_idle_connections():
+    # The event loops have usually stopped at exit, the synchronous destroy of the connections does not need them.
+    for pool in list(_CONNECTION_POOLS.values()):
+        for connection in pool.drain_idle():
+            connection.destroy()
+
+
+atexit.register(_destroy_idle_connections)
+
+
+class _DedicatedConnections(object):
+    """The client holds no connection, every sender and receiver opens its own."""
+
+    @staticmethod
+    async def acquire(client):
+        pass
+
+    @staticmethod
+    async def release(client):
+        pass
+
+
+class _SharedConnection(object):
+    """The client holds a pooled connection which all of its senders and receivers are bound to."""
+
+    @staticmethod
+    async def acquire(client):
+        # pylint: disable=protected-access
+        await client._pre_ping_connection()
+        if not client._connection:
+            await client._create_uamqp_connection()
+
+    @staticmethod
+    async def release(client):
+        # pylint: disable=protected-access
+        if client._connection:
+            for connection in client._connection_pool.release(client._connection_pool_key, client._connection):
+                await connection.destroy_async()
+            client._connection = None
+
 
 class ServiceBusClient(object):
     """The ServiceBusClient class defines a high level interface for
@@ -42,6 +103,13 @@ class ServiceBusClient(object):
     :keyword dict http_proxy: HTTP proxy settings. This must be a dictionary with the following
      keys: `'proxy_hostname'` (str value) and `'proxy_port'` (int value).
      Additionally the following keys may also be present: `'username', 'password'`.
+    :keyword float connection_idle_timeout: The time in seconds after which the shared connection is considered
+     broken if nothing was received on it. The service sends empty frames on an idle connection to honor it,
+     so a connection dropped without a close, which TCP alone would not notice, is closed once this time has
+     passed and `is_alive` returns False from then on. Default is None, meaning no timeout.
+    :keyword bool pre_ping: Whether to check that the shared connection is still alive whenever it is acquired,
+     i.e. by `async with`, `open`, `get_queue_senders`, `get_queue_receivers` and `get_queue_sender_pool`, and
+     replace it if it is not. Default is `False`.
 
     .. admonition:: Example:
 
@@ -53,6 +121,19 @@ class ServiceBusClient(object):
             :caption: Create a new instance of the ServiceBusClient.
 
     """
+    __slots__ = (
+        "fully_qualified_namespace",
+        "_credential",
+        "_entity_name",
+        "_config",
+        "_connection",
+        "_auth_uri",
+        "_connection_pool_key",
+        "_connection_pool",
+        "_connection_strategy",
+        "__weakref__",
+    )
+
     def __init__(
         self,
         fully_qualified_namespace,
@@ -61,31 +142,170 @@ class ServiceBusClient(object):
     ):
         # type: (str, TokenCredential, Any) -> None
         self.fully_qualified_namespace = fully_qualified_namespace
-        self._credential = credential
+        self._credential = credential if isinstance(credential, ServiceBusSharedKeyCredential) \
+            else _CachingTokenCredential(credential)
+        self._entity_name = kwargs.pop("entity_name", None)
         self._config = Configuration(**kwargs)
         self._connection = None
-        self._entity_name = kwargs.get("entity_name")
-        self._auth_uri = "sb://{}".format(self.fully_qualified_namespace)
-        if self._entity_name:
-            self._auth_uri = "{}/{}".format(self._auth_uri, self._entity_name)
-        # Internal flag for switching whether to apply connection sharing, pending fix in uamqp library
-        self._connection_sharing = False
+        self._auth_uri = "sb://" + self.fully_qualified_namespace + \
+            ("/" + self._entity_name if self._entity_name else "")
+        # The key holds every setting applied to the connection. The credential is part of it so that a
+        # connection is never shared across identities.
+        http_proxy = self._config.http_proxy
+        self._connection_pool_key = (
+            self._auth_uri,
+            self._config.transport_type,
+            frozenset(http_proxy.items()) if http_proxy else None,
+            self._config.connection_idle_timeout,
+            self._config.logging_enable,
+            self._credential
+        )
+        self._connection_pool = None  # type: Optional[_ConnectionPool]
+        # Connections are not shared by default, pending fix in uamqp library
+        self._connection_strategy = _DedicatedConnections
 
     async def __aenter__(self):
-        if self._connection_sharing:
-            await self._create_uamqp_connection()
+        await self._connection_strategy.acquire(self)
         return self
 
     async def __aexit__(self, *args):
         await self.close()
 
     async def _create_uamqp_connection(self):
-        auth = await create_authentication(self)
-        self._connection = uamqp.ConnectionAsync(
-            hostname=self.fully_qualified_namespace,
-            sasl=auth,
-            debug=self._config.logging_enable
-        )
+        self._connection_pool = _get_connection_pool()
+        connection, stale_connections = self._connection_pool.acquire(self._connection_pool_key)
+        for stale_connection in stale_connections:
+            await stale_connection.destroy_async()
+        if connection is None:
+            auth = await create_authentication(self)
+            idle_timeout = self._config.connection_idle_timeout
+            new_connection = uamqp.ConnectionAsync(
+                hostname=self.fully_qualified_namespace,
+                sasl=auth,
+                idle_timeout=int(idle_timeout * 1000) if idle_timeout else None,
+                debug=self._config.logging_enable
+            )
+            connection = self._connection_pool.add(self._connection_pool_key, new_connection)
+            if connection is not new_connection:
+                await new_connection.destroy_async()
+        self._connection = connection
+
+    async def is_alive(self):
+        # type: () -> bool
+        """Whether the shared connection of the client is usable.
+
+        This only applies to a client sharing its connection, e.g. one created with `open`. The connection
+        is worked once, without waiting for the service, so that a close by the service received since it was
+        last used is noticed; a connection dropped without a close is only noticed once `connection_idle_timeout`
+        has passed. It returns False if the client holds no shared connection, which is always the case for a
+        client whose senders and receivers open their own connections, or if the shared connection has been
+        closed or has failed, in which case a new client should be created.
+
+        :rtype: bool
+        """
+        return self._connection is not None and await ping_connection_async(self._connection)
+
+    async def _discard_uamqp_connection(self):
+        self._connection_pool.remove(self._connection_pool_key, self._connection)
+        await self._connection.destroy_async()
+        self._connection = None
+
+    async def _pre_ping_connection(self):
+        # The getters are not coroutines and cannot rebuild the connection, so the check is done on acquire.
+        if self._config.pre_ping and self._connection and not await self.is_alive():
+            await self._discard_uamqp_connection()
+            await self._create_uamqp_connection()
+
+    def _prefetch_token(self):
+        # A JWT is only requested once the CBS link is attached, after the handshake. Fetching it in a
+        # task while the handshake runs warms the token cache, so the two round trips overlap.
+        # pylint: disable=protected-access
+        if self._connection._state == c_uamqp.ConnectionState.OPENED or \
+                not isinstance(self._credential, _CachingTokenCredential) or \
+                getattr(self._credential, "token_type", TOKEN_TYPE_JWT) != TOKEN_TYPE_JWT:
+            return None
+        return asyncio.ensure_future(self._credential.get_token(JWT_TOKEN_SCOPE))
+
+    async def _handshake_uamqp_connection(self, deadline):
+        # uamqp only opens a connection when the first link on it begins, so drive the handshake here.
+        # pylint: disable=protected-access
+        connection = self._connection
+        error_message = "Failed to open the connection to {}.".format(self.fully_qualified_namespace)
+        try:
+            connection._conn.open()
+        except ValueError as e:
+            raise ServiceBusConnectionError(error_message, e)
+        while connection._state != c_uamqp.ConnectionState.OPENED:
+            if connection._state in (c_uamqp.ConnectionState.END, c_uamqp.ConnectionState.ERROR) \
+                    or time.time() > deadline:
+                raise ServiceBusConnectionError(error_message)
+            await connection.work_async()
+            await asyncio.sleep(0.01)
+
+    async def _open_uamqp_connection(self):
+        deadline = time.time() + self._config.auth_timeout
+        token_task = self._prefetch_token()
+        try:
+            await self._handshake_uamqp_connection(deadline)
+        except Exception:
+            if token_task is not None:
+                token_task.cancel()
+            raise
+        if token_task is not None:
+            try:
+                await asyncio.wait_for(token_task, max(deadline - time.time(), 0))
+            except asyncio.TimeoutError:
+                raise ServiceBusConnectionError(
+                    "Failed to open the connection to {}.".format(self.fully_qualified_namespace))
+
+    @classmethod
+    async def open(
+        cls,
+        fully_qualified_namespace,
+        credential,
+        **kwargs
+    ):
+        # type: (str, TokenCredential, Any) -> ServiceBusClient
+        """
+        Create a ServiceBusClient and open its shared connection before returning.
+
+        The senders and receivers got from the client are bound to this connection, so the connection
+        handshake is paid up front rather than on the first send or receive. The returned client
+        should be closed once it is no longer needed.
+
+        :param str fully_qualified_namespace: The fully qualified host name for the Service Bus namespace.
+         The namespace format is: `<yournamespace>.servicebus.windows.net`.
+        :param ~azure.core.credentials.TokenCredential credential: The credential object used for authentication
+         which implements a particular interface for getting tokens.
+        :keyword str entity_name: Optional entity name, this can be the name of Queue or Topic.
+         It must be specified if the credential is for specific Queue or Topic.
+        :keyword bool logging_enable: Whether to output network trace logs to the logger. Default is `False`.
+        :keyword transport_type: The type of transport protocol that will be used for communicating with
+         the Service Bus service. Default is `TransportType.Amqp`.
+        :paramtype transport_type: ~azure.servicebus.TransportType
+        :keyword dict http_proxy: HTTP proxy settings. This must be a dictionary with the following
+         keys: `'proxy_hostname'` (str value) and `'proxy_port'` (int value).
+         Additionally the following keys may also be present: `'username', 'password'`.
+        :keyword int auth_timeout: The time in seconds to wait for the connection to be opened. Default is 60.
+        :rtype: ~azure.servicebus.aio.ServiceBusClient
+        :raises: ~azure.servicebus.exceptions.ServiceBusConnectionError if the connection could not be opened.
+        """
+        client = cls(fully_qualified_namespace, credential, **kwargs)
+        # pylint: disable=protected-access
+        client._connection_strategy = _SharedConnection
+        was_open = False
+        try:
+            await _SharedConnection.acquire(client)
+            was_open = client._connection._state == c_uamqp.ConnectionState.OPENED
+            await client._open_uamqp_connection()
+        except Exception:
+            # Only keep a pooled connection which was open before, other clients are using it. Any other one,
+            # e.g. a connection stuck in its handshake, is discarded so that it is not handed out again.
+            if client._connection and not (was_open and is_connection_alive(client._connection)):
+                await client._discard_uamqp_connection()
+            await _SharedConnection.release(client)
+            raise
+        return client
 
     @classmethod
     def from_connection_string(
@@ -123,19 +343,20 @@ class ServiceBusClient(object):
         return cls(
             fully_qualified_namespace=host,
             entity_name=entity_in_conn_str or kwargs.pop("entity_name", None),
-            credential=ServiceBusSharedKeyCredential(policy, key),
+            credential=_get_shared_key_credential(ServiceBusSharedKeyCredential, policy, key),
             **kwargs
         )
 
     async def close(self):
         # type: () -> None
         """
-        Close down the ServiceBus client.
+        Close down the ServiceBus client and release the underlying connection.
+
+        A shared connection is only destroyed once no other client is using it.
 
         :return: None
         """
-        if self._connection_sharing and self._connection:
-            await self._connection.destroy_async()
+        await self._connection_strategy.release(self)
 
     def get_queue_sender(self, queue_name, **kwargs):
         # type: (str, Any) -> ServiceBusSender
@@ -168,6 +389,41 @@ class ServiceBusClient(object):
             **kwargs
         )
 
+    async def get_queue_senders(self, queue_names, **kwargs):
+        # type: (Sequence[str], Any) -> List[ServiceBusSender]
+        """Get ServiceBusSenders for multiple queues which share the connection of the client.
+
+        Connection sharing is turned on for the client and its connection is created if needed, so that
+        the connection handshake is done once for all of the queues.
+
+        :param list[str] queue_names: The paths of the Service Bus Queues to get senders for.
+        :keyword int retry_total: The total number of attempts to redo a failed operation when an error occurs.
+         Default value is 3.
+        :rtype: list[~azure.servicebus.aio.ServiceBusSender]
+        """
+        self._connection_strategy = _SharedConnection
+        await _SharedConnection.acquire(self)
+        return [self.get_queue_sender(queue_name, **kwargs) for queue_name in queue_names]
+
+    async def get_queue_sender_pool(self, queue_name, size=8, **kwargs):
+        # type: (str, int, Any) -> ServiceBusSenderPool
+        """Get a pool of ServiceBusSenders for the specific queue which share the connection of the client.
+
+        Connection sharing is turned on for the client and its connection is created if needed, so that
+        concurrent producers can send over multiple links without opening a new connection per sender.
+
+        :param str queue_name: The path of specific Service Bus Queue the client connects to.
+        :param int size: The number of senders in the pool. Default value is 8.
+        :keyword int retry_total: The total number of attempts to redo a failed operation when an error occurs.
+         Default value is 3.
+        :rtype: ~azure.servicebus.aio.ServiceBusSenderPool
+        """
+        if size < 1:
+            raise ValueError("The size of a sender pool must be at least 1.")
+        self._connection_strategy = _SharedConnection
+        await _SharedConnection.acquire(self)
+        return ServiceBusSenderPool([self.get_queue_sender(queue_name, **kwargs) for _ in range(size)])
+
     def get_queue_receiver(self, queue_name, **kwargs):
         # type: (str, Any) -> ServiceBusReceiver
         """Get ServiceBusReceiver for the specific queue.
@@ -211,6 +467,29 @@ class ServiceBusClient(object):
             **kwargs
         )
 
+    async def get_queue_receivers(self, queue_names, **kwargs):
+        # type: (Sequence[str], Any) -> List[ServiceBusReceiver]
+        """Get ServiceBusReceivers for multiple queues which share the connection of the client.
+
+        Connection sharing is turned on for the client and its connection is created if needed, so that
+        the connection handshake is done once for all of the queues.
+
+        :param list[str] queue_names: The paths of the Service Bus Queues to get receivers for.
+        :keyword mode: The mode with which messages will be retrieved from the entities. The default
+         mode is PeekLock.
+        :paramtype mode: ~azure.servicebus.ReceiveSettleMode
+        :keyword int prefetch: The maximum number of messages to cache with each request to the service.
+         The default value is 0.
+        :keyword float idle_timeout: The timeout in seconds between received messages after which the receivers
+         will automatically shutdown. The default value is 0, meaning no timeout.
+        :keyword int retry_total: The total number of attempts to redo a failed operation when an error occurs.
+         Default value is 3.
+        :rtype: list[~azure.servicebus.aio.ServiceBusReceiver]
+        """
+        self._connection_strategy = _SharedConnection
+        await _SharedConnection.acquire(self)
+        return [self.get_queue_receiver(queue_name, **kwargs) for queue_name in queue_names]
+
     def get_queue_deadletter_receiver(self, queue_name, **kwargs):
         # type: (str, Any) -> ServiceBusReceiver
         """Get ServiceBusReceiver for the dead-letter queue which is the secondary subqueue provided by
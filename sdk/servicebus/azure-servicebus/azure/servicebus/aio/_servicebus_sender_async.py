@@ -313,3 +313,54 @@ class ServiceBusSender(BaseHandler, SenderMixin):
         return BatchMessage(
             max_size_in_bytes=(max_size_in_bytes or self._max_message_size_on_link)
         )
+
+
+class ServiceBusSenderPool(object):
+    """A fixed set of ServiceBusSenders to the same entity which share one connection.
+
+    Each send checks an idle sender out of the pool and returns it once the message is sent, so that
+    concurrent producers never share a sender and each use their own link. Use
+    :func:`ServiceBusClient.get_queue_sender_pool<azure.servicebus.aio.ServiceBusClient.get_queue_sender_pool>`
+    to create the pool.
+
+    :param list[~azure.servicebus.aio.ServiceBusSender] senders: The senders to dispatch messages to.
+    """
+    def __init__(self, senders):
+        # type: (List[ServiceBusSender]) -> None
+        if not senders:
+            raise ValueError("A ServiceBusSenderPool must hold at least one sender.")
+        self.senders = senders
+        self._idle_senders = asyncio.Queue()  # type: asyncio.Queue
+        for sender in senders:
+            self._idle_senders.put_nowait(sender)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    def __len__(self):
+        return len(self.senders)
+
+    async def send(self, message):
+        # type: (Union[Message, BatchMessage, List[Message]]) -> None
+        """Send the message with an idle sender of the pool, waiting for one if all of them are busy.
+
+        :param message: The ServiceBus message to be sent.
+        :type message: ~azure.servicebus.Message or ~azure.servicebus.BatchMessage or list[~azure.servicebus.Message]
+        :rtype: None
+        """
+        sender = await self._idle_senders.get()
+        try:
+            await sender.send(message)
+        finally:
+            self._idle_senders.put_nowait(sender)
+
+    async def close(self):
+        # type: () -> None
+        """Close down the links of all the senders in the pool.
+
+        :rtype: None
+        """
+        await asyncio.gather(*[sender.close() for sender in self.senders])
@@ -0,0 +1,222 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+#--------------------------------------------------------------------------
+
+import asyncio
+import time
+from collections import namedtuple
+
+import pytest
+from uamqp import c_uamqp
+
+from azure.servicebus._common.constants import JWT_TOKEN_SCOPE
+from azure.servicebus.aio import ServiceBusClient, ServiceBusSharedKeyCredential
+from azure.servicebus.aio._servicebus_client_async import _get_connection_pool
+from azure.servicebus.exceptions import ServiceBusConnectionError
+
+AccessToken = namedtuple("AccessToken", ["token", "expires_on"])
+
+
+class MockUamqpConnection(object):
+    def __init__(self):
+        self.error = None
+
+    def open(self):
+        if self.error:
+            raise self.error
+
+
+class MockConnection(object):
+    def __init__(self, state=c_uamqp.ConnectionState.OPENED):
+        self._closing = False
+        self._error = None
+        self._state = state
+        self.worked = 0
+        self.destroyed = False
+        # The state the connection moves to once it is worked, e.g. on a close by the service.
+        self.next_state = None
+        self._conn = MockUamqpConnection()
+
+    async def work_async(self):
+        if self._error:
+            raise self._error
+        self.worked += 1
+        if self.next_state is not None:
+            self._state = self.next_state
+
+    def destroy(self):
+        self.destroyed = True
+
+    async def destroy_async(self):
+        self.destroy()
+
+
+def run(coroutine):
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
+
+def pool_connection(namespace, credential, connection, **kwargs):
+    """Register the connection in the pool as if another client was holding it, return that client's release."""
+    pool_key = ServiceBusClient(namespace, credential, **kwargs)._connection_pool_key
+    _get_connection_pool().add(pool_key, connection)
+    return lambda: _get_connection_pool().release(pool_key, connection)
+
+
+def pool_refcount(namespace, credential, **kwargs):
+    pool_key = ServiceBusClient(namespace, credential, **kwargs)._connection_pool_key
+    entry = _get_connection_pool()._connections.get(pool_key)
+    return entry[1] if entry else None
+
+
+def test_async_open_reuses_open_connection():
+    namespace, credential = "open-reuse.servicebus.windows.net", ServiceBusSharedKeyCredential("mock", "mock")
+    connection = MockConnection()
+    release = pool_connection(namespace, credential, connection)
+
+    client = run(ServiceBusClient.open(namespace, credential))
+    assert client._connection is connection
+    assert pool_refcount(namespace, credential) == 2
+    assert client.get_queue_sender("mock")._connection is connection
+
+    run(client.close())
+    assert pool_refcount(namespace, credential) == 1
+    release()
+    assert not connection.destroyed
+
+
+def test_async_open_timeout_discards_connection():
+    namespace, credential = "open-timeout.servicebus.windows.net", ServiceBusSharedKeyCredential("mock", "mock")
+    connection = MockConnection(c_uamqp.ConnectionState.START)
+    release = pool_connection(namespace, credential, connection)
+    release()
+
+    with pytest.raises(ServiceBusConnectionError):
+        run(ServiceBusClient.open(namespace, credential, auth_timeout=0.05))
+    assert connection.worked > 0
+    assert connection.destroyed
+    assert pool_refcount(namespace, credential) is None
+
+
+def test_async_open_failure_keeps_open_connection_of_other_clients():
+    namespace, credential = "open-failure.servicebus.windows.net", ServiceBusSharedKeyCredential("mock", "mock")
+    connection = MockConnection()
+    connection._conn.error = ValueError("Failed to open.")
+    release = pool_connection(namespace, credential, connection)
+
+    with pytest.raises(ServiceBusConnectionError):
+        run(ServiceBusClient.open(namespace, credential))
+    assert not connection.destroyed
+    assert pool_refcount(namespace, credential) == 1
+    release()
+
+
+class MockCredential(object):
+    def __init__(self, event=None):
+        self.event = event
+        self.calls = 0
+
+    async def get_token(self, *scopes, **kwargs):
+        self.calls += 1
+        if self.event:
+            await self.event.wait()
+        return AccessToken("token", time.time() + 3600)
+
+
+def test_async_open_prefetches_token_during_handshake():
+    namespace, credential = "prefetch.servicebus.windows.net", MockCredential()
+    connection = MockConnection(c_uamqp.ConnectionState.START)
+    connection.next_state = c_uamqp.ConnectionState.OPENED
+    release = pool_connection(namespace, credential, connection)
+
+    client = run(ServiceBusClient.open(namespace, credential))
+    assert credential.calls == 1
+    run(client._credential.get_token(JWT_TOKEN_SCOPE))
+    assert credential.calls == 1
+    run(client.close())
+    release()
+
+
+def test_async_open_skips_prefetch_for_open_connection():
+    namespace, credential = "prefetch-open.servicebus.windows.net", MockCredential()
+    release = pool_connection(namespace, credential, MockConnection())
+
+    client = run(ServiceBusClient.open(namespace, credential))
+    assert credential.calls == 0
+    run(client.close())
+    release()
+
+
+def test_async_open_prefetch_timeout():
+    namespace, credential = "prefetch-timeout.servicebus.windows.net", MockCredential(asyncio.Event())
+    connection = MockConnection(c_uamqp.ConnectionState.START)
+    connection.next_state = c_uamqp.ConnectionState.OPENED
+    release = pool_connection(namespace, credential, connection)
+    release()
+
+    with pytest.raises(ServiceBusConnectionError):
+        run(ServiceBusClient.open(namespace, credential, auth_timeout=0.05))
+    assert credential.calls == 1
+    assert connection.destroyed
+
+
+def test_async_pre_ping_replaces_dead_connection():
+    namespace, credential = "pre-ping-dead.servicebus.windows.net", ServiceBusSharedKeyCredential("mock", "mock")
+    connection = MockConnection()
+    release = pool_connection(namespace, credential, connection)
+
+    client = run(ServiceBusClient.open(namespace, credential, pre_ping=True))
+    connection.next_state = c_uamqp.ConnectionState.END
+    senders = run(client.get_queue_senders(["mock"]))
+    assert connection.destroyed
+    assert client._connection is not connection
+    assert senders[0]._connection is client._connection
+    run(client.close())
+    release()
+
+
+def test_async_pre_ping_keeps_live_connection():
+    namespace, credential = "pre-ping-live.servicebus.windows.net", ServiceBusSharedKeyCredential("mock", "mock")
+    connection = MockConnection()
+    release = pool_connection(namespace, credential, connection)
+
+    client = run(ServiceBusClient.open(namespace, credential, pre_ping=True))
+    receivers = run(client.get_queue_receivers(["mock"]))
+    assert receivers[0]._connection is connection
+    assert connection.worked > 0
+    assert not connection.destroyed
+    run(client.close())
+    release()
+
+
+def test_async_get_queue_sender_pool_shares_connection():
+    namespace, credential = "sender-pool.servicebus.windows.net", ServiceBusSharedKeyCredential("mock", "mock")
+    connection = MockConnection()
+    release = pool_connection(namespace, credential, connection)
+
+    client = ServiceBusClient(namespace, credential)
+    pool = run(client.get_queue_sender_pool("mock", size=3))
+    assert len(pool) == 3
+    assert all(sender._connection is connection for sender in pool.senders)
+    assert pool_refcount(namespace, credential) == 2
+    run(client.close())
+    release()
+
+
+def test_async_get_queue_senders_and_receivers_share_connection():
+    namespace, credential = "multiple-queues.servicebus.windows.net", ServiceBusSharedKeyCredential("mock", "mock")
+    connection = MockConnection()
+    release = pool_connection(namespace, credential, connection)
+
+    client = ServiceBusClient(namespace, credential)
+    senders = run(client.get_queue_senders(["first", "second"]))
+    receivers = run(client.get_queue_receivers(["first", "second"], prefetch=10))
+    assert [sender._entity_name for sender in senders] == ["first", "second"]
+    assert [receiver._entity_name for receiver in receivers] == ["first", "second"]
+    assert all(handler._connection is connection for handler in senders + receivers)
+    # The client takes a single reference on the connection, however many handlers it binds to it.
+    assert pool_refcount(namespace, credential) == 2
+    run(client.close())
+    assert pool_refcount(namespace, credential) == 1
+    release()
@@ -0,0 +1,55 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+#--------------------------------------------------------------------------
+
+import asyncio
+
+import pytest
+
+from azure.servicebus.aio import ServiceBusSenderPool
+
+
+class MockSender(object):
+    def __init__(self):
+        self.messages = []
+        self.in_use = False
+        self.closed = False
+
+    async def send(self, message):
+        assert not self.in_use, "Sender used concurrently."
+        self.in_use = True
+        await asyncio.sleep(0.01)
+        self.messages.append(message)
+        self.in_use = False
+
+    async def close(self):
+        self.closed = True
+
+
+def run(coroutine):
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
+
+def test_async_sender_pool_requires_senders():
+    with pytest.raises(ValueError):
+        ServiceBusSenderPool([])
+
+
+def test_async_sender_pool_concurrent_send():
+    senders = [MockSender(), MockSender()]
+
+    async def produce(pool, count):
+        for i in range(count):
+            await pool.send(i)
+
+    async def main():
+        async with ServiceBusSenderPool(senders) as pool:
+            assert len(pool) == 2
+            await asyncio.gather(*[produce(pool, 5) for _ in range(6)])
+
+    run(main())
+    assert sum(len(sender.messages) for sender in senders) == 30
+    assert all(sender.messages for sender in senders)
+    assert all(sender.closed for sender in senders)
@@ -0,0 +1,52 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+#--------------------------------------------------------------------------
+
+import asyncio
+import time
+from collections import namedtuple
+
+from azure.servicebus.aio._base_handler_async import _CachingTokenCredential
+
+AccessToken = namedtuple("AccessToken", ["token", "expires_on"])
+
+
+class MockCredential(object):
+    def __init__(self, lifetime=3600):
+        self.lifetime = lifetime
+        self.calls = []
+
+    async def get_token(self, *scopes, **kwargs):
+        self.calls.append((scopes, kwargs))
+        return AccessToken("token{}".format(len(self.calls)), time.time() + self.lifetime)
+
+
+def run(coroutine):
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
+
+def test_async_caching_token_credential_reuses_token():
+    credential = MockCredential()
+    caching_credential = _CachingTokenCredential(credential)
+    first = run(caching_credential.get_token("scope"))
+    assert run(_CachingTokenCredential(credential).get_token("scope")) is first
+    assert len(credential.calls) == 1
+
+
+def test_async_caching_token_credential_refreshes_expiring_token():
+    credential = MockCredential(lifetime=60)
+    caching_credential = _CachingTokenCredential(credential)
+    first = run(caching_credential.get_token("scope"))
+    assert run(caching_credential.get_token("scope")) is not first
+    assert len(credential.calls) == 2
+
+
+def test_async_caching_token_credential_bypasses_cache_with_kwargs():
+    credential = MockCredential()
+    caching_credential = _CachingTokenCredential(credential)
+    run(caching_credential.get_token("scope"))
+    run(caching_credential.get_token("scope", claims="claims"))
+    assert credential.calls[1] == (("scope",), {"claims": "claims"})
+    assert len(credential.calls) == 2
@@ -140,7 +140,7 @@ class StressTestRunner:
 
 
     def _Receive(self, receiver, end_time):
-        receiver._config.idle_timeout = self.idle_timeout
+        receiver._idle_timeout = self.idle_timeout
         with receiver:
             while end_time > datetime.utcnow():
                 if self.receive_type == ReceiveType.pull:
@@ -0,0 +1,53 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+#--------------------------------------------------------------------------
+
+from azure.servicebus import ServiceBusClient, ServiceBusSender, ServiceBusSharedKeyCredential
+from azure.servicebus._base_handler import _LRUCache, _get_shared_key_credential, _parse_conn_str
+from azure.servicebus.aio import ServiceBusSharedKeyCredential as AsyncServiceBusSharedKeyCredential
+
+CONN_STR = "Endpoint=sb://mock.servicebus.windows.net/;SharedAccessKeyName=policy;SharedAccessKey=key;EntityPath=queue"
+
+
+def test_lru_cache_reuses_value():
+    cache = _LRUCache(2)
+    calls = []
+    first = cache.get_or_create("key", lambda: calls.append("key") or object())
+    assert cache.get_or_create("key", lambda: calls.append("key") or object()) is first
+    assert calls == ["key"]
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = _LRUCache(2)
+    first = cache.get_or_create("first", object)
+    second = cache.get_or_create("second", object)
+    # Using the first item makes the second one the least recently used.
+    assert cache.get_or_create("first", object) is first
+    cache.get_or_create("third", object)
+    assert cache.get_or_create("first", object) is first
+    assert cache.get_or_create("second", object) is not second
+
+
+def test_parse_conn_str_cached():
+    parsed = _parse_conn_str(CONN_STR)
+    assert parsed == ("mock.servicebus.windows.net", "policy", "key", "queue")
+    assert _parse_conn_str(CONN_STR) is parsed
+    assert _parse_conn_str(CONN_STR.replace("queue", "other")) is not parsed
+
+
+def test_shared_key_credential_interned():
+    first = _get_shared_key_credential(ServiceBusSharedKeyCredential, "policy", "key")
+    assert _get_shared_key_credential(ServiceBusSharedKeyCredential, "policy", "key") is first
+    assert _get_shared_key_credential(ServiceBusSharedKeyCredential, "policy", "other key") is not first
+    assert _get_shared_key_credential(AsyncServiceBusSharedKeyCredential, "policy", "key") is not first
+
+
+def test_clients_from_connection_string_share_credential():
+    first = ServiceBusClient.from_connection_string(CONN_STR)
+    second = ServiceBusClient.from_connection_string(CONN_STR)
+    assert first._credential is second._credential
+    assert first._connection_pool_key == second._connection_pool_key
+    sender = ServiceBusSender.from_connection_string(CONN_STR)
+    assert sender._credential is first._credential
@@ -0,0 +1,110 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+#--------------------------------------------------------------------------
+
+import time
+
+from uamqp import c_uamqp
+
+from azure.servicebus._common._connection_pool import _ConnectionPool
+
+
+class MockConnection(object):
+    def __init__(self):
+        self._closing = False
+        self._error = None
+        self._state = c_uamqp.ConnectionState.OPENED
+
+
+def test_connection_pool_acquire_empty():
+    pool = _ConnectionPool()
+    assert pool.acquire("key") == (None, [])
+
+
+def test_connection_pool_refcount():
+    pool = _ConnectionPool(max_idle=0)
+    connection = MockConnection()
+    assert pool.add("key", connection) is connection
+    assert pool.acquire("key") == (connection, [])
+
+    assert pool.release("key", connection) == []
+    assert pool.release("key", connection) == [connection]
+    assert pool.acquire("key") == (None, [])
+
+
+def test_connection_pool_add_race():
+    pool = _ConnectionPool()
+    first, second = MockConnection(), MockConnection()
+    assert pool.add("key", first) is first
+    assert pool.add("key", second) is first
+    assert pool.release("key", first) == []
+    assert pool.release("key", first) == []
+    assert pool.acquire("key") == (first, [])
+
+
+def test_connection_pool_evicts_least_recently_used_idle():
+    pool = _ConnectionPool(max_idle=1)
+    first, second = MockConnection(), MockConnection()
+    pool.add("first", first)
+    pool.add("second", second)
+    assert pool.release("first", first) == []
+    assert pool.release("second", second) == [first]
+    assert pool.acquire("second") == (second, [])
+
+
+def test_connection_pool_drops_broken_idle_connection():
+    pool = _ConnectionPool()
+    connection = MockConnection()
+    pool.add("key", connection)
+    pool.release("key", connection)
+    connection._state = c_uamqp.ConnectionState.END
+    assert pool.acquire("key") == (None, [connection])
+    assert pool.acquire("key") == (None, [])
+
+
+def test_connection_pool_drops_expired_idle_connection():
+    pool = _ConnectionPool(max_idle_time=0.01)
+    connection = MockConnection()
+    pool.add("key", connection)
+    pool.release("key", connection)
+    time.sleep(0.05)
+    assert pool.acquire("key") == (None, [connection])
+
+
+def test_connection_pool_retires_broken_connection_in_use():
+    pool = _ConnectionPool()
+    connection = MockConnection()
+    pool.add("key", connection)
+    connection._error = Exception("Connection closed by the service.")
+    assert pool.acquire("key") == (None, [])
+
+    replacement = MockConnection()
+    assert pool.add("key", replacement) is replacement
+    assert pool.release("key", connection) == [connection]
+    assert pool.acquire("key") == (replacement, [])
+
+
+def test_connection_pool_remove():
+    pool = _ConnectionPool()
+    connection, other = MockConnection(), MockConnection()
+    pool.add("key", connection)
+    pool.remove("key", other)
+    assert pool.acquire("key") == (connection, [])
+
+    pool.remove("key", connection)
+    assert pool.acquire("key") == (None, [])
+    assert pool.release("key", connection) == []
+
+
+def test_connection_pool_drain_idle():
+    pool = _ConnectionPool()
+    idle, in_use = MockConnection(), MockConnection()
+    pool.add("idle", idle)
+    pool.add("in use", in_use)
+    assert pool.release("idle", idle) == []
+
+    assert pool.drain_idle() == [idle]
+    assert pool.acquire("idle") == (None, [])
+    assert pool.acquire("in use") == (in_use, [])
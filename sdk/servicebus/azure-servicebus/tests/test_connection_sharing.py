@@ -0,0 +1,226 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+#--------------------------------------------------------------------------
+
+import threading
+import time
+from collections import namedtuple
+
+import pytest
+from uamqp import c_uamqp
+
+from azure.servicebus import ServiceBusClient, ServiceBusSharedKeyCredential
+from azure.servicebus._common.constants import JWT_TOKEN_SCOPE
+from azure.servicebus._common.utils import is_connection_alive, ping_connection
+from azure.servicebus._servicebus_client import _CONNECTION_POOL
+from azure.servicebus.exceptions import ServiceBusConnectionError
+
+AccessToken = namedtuple("AccessToken", ["token", "expires_on"])
+
+
+class MockUamqpConnection(object):
+    def __init__(self):
+        self.opened = 0
+        self.error = None
+
+    def open(self):
+        if self.error:
+            raise self.error
+        self.opened += 1
+
+
+class MockConnection(object):
+    def __init__(self, state=c_uamqp.ConnectionState.OPENED):
+        self._closing = False
+        self._error = None
+        self._state = state
+        self.worked = 0
+        self.destroyed = False
+        # The state the connection moves to once it is worked, e.g. on a close by the service.
+        self.next_state = None
+        self._conn = MockUamqpConnection()
+
+    def work(self):
+        if self._error:
+            raise self._error
+        self.worked += 1
+        if self.next_state is not None:
+            self._state = self.next_state
+
+    def destroy(self):
+        self.destroyed = True
+
+
+def test_is_connection_alive():
+    assert not is_connection_alive(None)
+    assert is_connection_alive(MockConnection())
+    assert is_connection_alive(MockConnection(c_uamqp.ConnectionState.START))
+    assert not is_connection_alive(MockConnection(c_uamqp.ConnectionState.END))
+    connection = MockConnection()
+    connection._closing = True
+    assert not is_connection_alive(connection)
+
+
+def test_ping_connection_processes_close():
+    connection = MockConnection()
+    connection.next_state = c_uamqp.ConnectionState.END
+    assert is_connection_alive(connection)
+    assert not ping_connection(connection)
+    assert connection.worked == 1
+
+
+def test_ping_connection_failed_connection():
+    connection = MockConnection()
+    connection._error = Exception("Connection closed by the service.")
+    assert not ping_connection(connection)
+
+
+def pool_connection(namespace, credential, connection, **kwargs):
+    """Register the connection in the pool as if another client was holding it, return that client's release."""
+    pool_key = ServiceBusClient(namespace, credential, **kwargs)._connection_pool_key
+    _CONNECTION_POOL.add(pool_key, connection)
+    return lambda: _CONNECTION_POOL.release(pool_key, connection)
+
+
+def pool_refcount(namespace, credential, **kwargs):
+    pool_key = ServiceBusClient(namespace, credential, **kwargs)._connection_pool_key
+    entry = _CONNECTION_POOL._connections.get(pool_key)
+    return entry[1] if entry else None
+
+
+def test_open_reuses_open_connection():
+    namespace, credential = "open-reuse.servicebus.windows.net", ServiceBusSharedKeyCredential("mock", "mock")
+    connection = MockConnection()
+    release = pool_connection(namespace, credential, connection)
+
+    client = ServiceBusClient.open(namespace, credential)
+    assert client._connection is connection
+    assert pool_refcount(namespace, credential) == 2
+    assert client.get_queue_sender("mock")._connection is connection
+
+    client.close()
+    assert pool_refcount(namespace, credential) == 1
+    release()
+    assert not connection.destroyed
+
+
+def test_open_timeout_discards_connection():
+    namespace, credential = "open-timeout.servicebus.windows.net", ServiceBusSharedKeyCredential("mock", "mock")
+    connection = MockConnection(c_uamqp.ConnectionState.START)
+    release = pool_connection(namespace, credential, connection)
+    release()
+
+    with pytest.raises(ServiceBusConnectionError):
+        ServiceBusClient.open(namespace, credential, auth_timeout=0.05)
+    assert connection.worked > 0
+    assert connection.destroyed
+    assert pool_refcount(namespace, credential) is None
+
+
+def test_open_failure_keeps_open_connection_of_other_clients():
+    namespace, credential = "open-failure.servicebus.windows.net", ServiceBusSharedKeyCredential("mock", "mock")
+    connection = MockConnection()
+    connection._conn.error = ValueError("Failed to open.")
+    release = pool_connection(namespace, credential, connection)
+
+    with pytest.raises(ServiceBusConnectionError):
+        ServiceBusClient.open(namespace, credential)
+    assert not connection.destroyed
+    assert pool_refcount(namespace, credential) == 1
+    release()
+
+
+class MockCredential(object):
+    def __init__(self, event=None):
+        self.event = event
+        self.calls = 0
+
+    def get_token(self, *scopes, **kwargs):
+        self.calls += 1
+        if self.event:
+            self.event.wait()
+        return AccessToken("token", time.time() + 3600)
+
+
+def test_open_prefetches_token_during_handshake():
+    namespace, credential = "prefetch.servicebus.windows.net", MockCredential()
+    connection = MockConnection(c_uamqp.ConnectionState.START)
+    connection.next_state = c_uamqp.ConnectionState.OPENED
+    release = pool_connection(namespace, credential, connection)
+
+    with ServiceBusClient.open(namespace, credential) as client:
+        assert credential.calls == 1
+        client._credential.get_token(JWT_TOKEN_SCOPE)
+        assert credential.calls == 1
+    release()
+
+
+def test_open_skips_prefetch_for_open_connection():
+    namespace, credential = "prefetch-open.servicebus.windows.net", MockCredential()
+    release = pool_connection(namespace, credential, MockConnection())
+
+    with ServiceBusClient.open(namespace, credential):
+        assert credential.calls == 0
+    release()
+
+
+def test_open_prefetch_timeout():
+    namespace, credential = "prefetch-timeout.servicebus.windows.net", MockCredential(threading.Event())
+    connection = MockConnection(c_uamqp.ConnectionState.START)
+    connection.next_state = c_uamqp.ConnectionState.OPENED
+    release = pool_connection(namespace, credential, connection)
+    release()
+
+    try:
+        with pytest.raises(ServiceBusConnectionError):
+            ServiceBusClient.open(namespace, credential, auth_timeout=0.05)
+        assert credential.calls == 1
+        assert connection.destroyed
+    finally:
+        credential.event.set()
+
+
+def test_pre_ping_replaces_dead_connection():
+    namespace, credential = "pre-ping-dead.servicebus.windows.net", ServiceBusSharedKeyCredential("mock", "mock")
+    connection = MockConnection()
+    release = pool_connection(namespace, credential, connection)
+
+    with ServiceBusClient.open(namespace, credential, pre_ping=True) as client:
+        connection.next_state = c_uamqp.ConnectionState.END
+        sender = client.get_queue_sender("mock")
+        assert connection.destroyed
+        assert sender._connection is client._connection
+        assert client._connection is not connection
+    release()
+
+
+def test_pre_ping_keeps_live_connection():
+    namespace, credential = "pre-ping-live.servicebus.windows.net", ServiceBusSharedKeyCredential("mock", "mock")
+    connection = MockConnection()
+    release = pool_connection(namespace, credential, connection)
+
+    with ServiceBusClient.open(namespace, credential, pre_ping=True) as client:
+        assert client.get_queue_receiver("mock")._connection is connection
+        assert connection.worked > 0
+        assert not connection.destroyed
+    release()
+
+
+def test_get_queue_senders_and_receivers_share_connection():
+    namespace, credential = "multiple-queues.servicebus.windows.net", ServiceBusSharedKeyCredential("mock", "mock")
+    connection = MockConnection()
+    release = pool_connection(namespace, credential, connection)
+
+    client = ServiceBusClient(namespace, credential)
+    senders = client.get_queue_senders(["first", "second"])
+    receivers = client.get_queue_receivers(["first", "second"], prefetch=10)
+    assert [sender._entity_name for sender in senders] == ["first", "second"]
+    assert [receiver._entity_name for receiver in receivers] == ["first", "second"]
+    assert all(handler._connection is connection for handler in senders + receivers)
+    # The client takes a single reference on the connection, however many handlers it binds to it.
+    assert pool_refcount(namespace, credential) == 2
+    client.close()
+    assert pool_refcount(namespace, credential) == 1
+    release()
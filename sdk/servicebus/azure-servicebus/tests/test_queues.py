@@ -1174,6 +1174,51 @@ class ServiceBusQueueTests(AzureMgmtTestCase):
                 messages = receiver.receive(max_wait_time=5)
                 assert len(messages) == 1
 
+    @pytest.mark.liveTest
+    @pytest.mark.live_test_only
+    @CachedResourceGroupPreparer(name_prefix='servicebustest')
+    @CachedServiceBusNamespacePreparer(name_prefix='servicebustest')
+    @ServiceBusQueuePreparer(name_prefix='servicebustest', dead_lettering_on_message_expiration=True)
+    def test_queue_sender_pool_send(self, servicebus_namespace_connection_string, servicebus_queue, **kwargs):
+        with ServiceBusClient.from_connection_string(
+                servicebus_namespace_connection_string,
+                logging_enable=False) as sb_client:
+
+            with sb_client.get_queue_sender_pool(servicebus_queue.name, size=3) as sender_pool:
+                assert len(sender_pool) == 3
+                assert all(sender._connection is sb_client._connection for sender in sender_pool.senders)
+                for i in range(6):
+                    sender_pool.send(Message("Message {}".format(i)))
+
+            with sb_client.get_queue_receiver(servicebus_queue.name, mode=ReceiveSettleMode.ReceiveAndDelete,
+                                              idle_timeout=5) as receiver:
+                count = len(list(receiver))
+            assert count == 6
+
+    @pytest.mark.liveTest
+    @pytest.mark.live_test_only
+    @CachedResourceGroupPreparer(name_prefix='servicebustest')
+    @CachedServiceBusNamespacePreparer(name_prefix='servicebustest')
+    @ServiceBusQueuePreparer(name_prefix='servicebustest', dead_lettering_on_message_expiration=True)
+    def test_queue_get_senders_and_receivers_share_connection(self, servicebus_namespace_connection_string, servicebus_queue, **kwargs):
+        with ServiceBusClient.from_connection_string(
+                servicebus_namespace_connection_string,
+                logging_enable=False) as sb_client:
+
+            senders = sb_client.get_queue_senders([servicebus_queue.name, servicebus_queue.name])
+            receivers = sb_client.get_queue_receivers([servicebus_queue.name],
+                                                      mode=ReceiveSettleMode.ReceiveAndDelete,
+                                                      idle_timeout=5)
+            assert all(handler._connection is sb_client._connection for handler in senders + receivers)
+
+            for i, sender in enumerate(senders):
+                with sender:
+                    sender.send(Message("Message {}".format(i)))
+
+            with receivers[0] as receiver:
+                count = len(list(receiver))
+            assert count == 2
+
     def test_queue_message_http_proxy_setting(self):
         mock_conn_str = "Endpoint=sb://mock.servicebus.windows.net/;SharedAccessKeyName=mock;SharedAccessKey=mock"
         http_proxy = {
@@ -8,6 +8,7 @@ import logging
 import sys
 import os
 import pytest
+import weakref
 import time
 from datetime import datetime, timedelta
 
@@ -125,4 +126,9 @@ class ServiceBusClientTests(AzureMgmtTestCase):
         with client:
             with pytest.raises(ServiceBusError):
                 with client.get_queue_sender(wrong_queue.name) as sender:
-                    sender.send(Message("test"))
\ No newline at end of file
+                    sender.send(Message("test"))
+
+    def test_sb_client_weakref(self):
+        mock_conn_str = "Endpoint=sb://mock.servicebus.windows.net/;SharedAccessKeyName=mock;SharedAccessKey=mock"
+        client = ServiceBusClient.from_connection_string(mock_conn_str)
+        assert weakref.ref(client)() is client
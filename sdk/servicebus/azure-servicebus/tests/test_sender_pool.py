@@ -0,0 +1,58 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+#--------------------------------------------------------------------------
+
+import threading
+import time
+
+import pytest
+
+from azure.servicebus import ServiceBusSenderPool
+
+
+class MockSender(object):
+    def __init__(self):
+        self.messages = []
+        self.in_use = False
+        self.closed = False
+
+    def send(self, message):
+        assert not self.in_use, "Sender used concurrently."
+        self.in_use = True
+        time.sleep(0.01)
+        self.messages.append(message)
+        self.in_use = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_sender_pool_requires_senders():
+    with pytest.raises(ValueError):
+        ServiceBusSenderPool([])
+
+
+def test_sender_pool_concurrent_send():
+    senders = [MockSender(), MockSender()]
+    errors = []
+
+    def produce(pool, count):
+        try:
+            for i in range(count):
+                pool.send(i)
+        except AssertionError as e:
+            errors.append(e)
+
+    with ServiceBusSenderPool(senders) as pool:
+        assert len(pool) == 2
+        threads = [threading.Thread(target=produce, args=(pool, 5)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert not errors
+    assert sum(len(sender.messages) for sender in senders) == 30
+    assert all(sender.closed for sender in senders)
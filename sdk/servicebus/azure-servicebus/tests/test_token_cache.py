@@ -0,0 +1,123 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+#--------------------------------------------------------------------------
+
+import threading
+import time
+from collections import namedtuple
+
+from azure.servicebus import ServiceBusClient
+from azure.servicebus._base_handler import _CachingTokenCredential, _get_token_refresh_time
+
+AccessToken = namedtuple("AccessToken", ["token", "expires_on"])
+
+
+class MockCredential(object):
+    def __init__(self, lifetime=3600):
+        self.lifetime = lifetime
+        self.calls = []
+
+    def get_token(self, *scopes, **kwargs):
+        self.calls.append((scopes, kwargs))
+        return AccessToken("token{}".format(len(self.calls)), time.time() + self.lifetime)
+
+
+class UnhashableMockCredential(MockCredential):
+    __hash__ = None
+
+
+class BlockingMockCredential(MockCredential):
+    def __init__(self):
+        super(BlockingMockCredential, self).__init__()
+        self.event = threading.Event()
+        self.event.set()
+        self.fetching = threading.Event()
+
+    def get_token(self, *scopes, **kwargs):
+        self.fetching.set()
+        self.event.wait()
+        return super(BlockingMockCredential, self).get_token(*scopes, **kwargs)
+
+
+def test_token_refresh_time():
+    now = time.time()
+    # A long lived token is reused until 20% of its lifetime is left.
+    assert abs(_get_token_refresh_time(now + 3600) - (now + 2880)) < 1
+    # A short lived token is reused until 5 minutes before it expires.
+    assert abs(_get_token_refresh_time(now + 600) - (now + 300)) < 1
+    assert _get_token_refresh_time(now + 60) < now
+
+
+def test_caching_token_credential_reuses_token():
+    credential = MockCredential()
+    caching_credential = _CachingTokenCredential(credential)
+    first = caching_credential.get_token("scope")
+    assert caching_credential.get_token("scope") is first
+    assert caching_credential.get_token("other scope") is not first
+    assert len(credential.calls) == 2
+
+
+def test_caching_token_credential_refreshes_expiring_token():
+    credential = MockCredential(lifetime=60)
+    caching_credential = _CachingTokenCredential(credential)
+    first = caching_credential.get_token("scope")
+    assert caching_credential.get_token("scope") is not first
+    assert len(credential.calls) == 2
+
+
+def test_caching_token_credential_bypasses_cache_with_kwargs():
+    credential = MockCredential()
+    caching_credential = _CachingTokenCredential(credential)
+    caching_credential.get_token("scope")
+    caching_credential.get_token("scope", claims="claims")
+    caching_credential.get_token("scope", claims="claims")
+    assert credential.calls[1:] == [(("scope",), {"claims": "claims"})] * 2
+
+
+def test_caching_token_credential_shared_across_clients():
+    credential = MockCredential()
+    first_client = ServiceBusClient("mock.servicebus.windows.net", credential)
+    second_client = ServiceBusClient("mock.servicebus.windows.net", credential)
+    assert first_client._credential == second_client._credential
+    assert hash(first_client._credential) == hash(second_client._credential)
+    first_client._credential.get_token("scope")
+    second_client._credential.get_token("scope")
+    assert len(credential.calls) == 1
+    assert _CachingTokenCredential(MockCredential()) != first_client._credential
+
+
+def test_caching_token_credential_unhashable_credential():
+    credential = UnhashableMockCredential()
+    caching_credential = _CachingTokenCredential(credential)
+    assert caching_credential == _CachingTokenCredential(credential)
+    assert hash(caching_credential) == hash(_CachingTokenCredential(credential))
+    caching_credential.get_token("scope")
+    assert caching_credential.get_token("scope").token == "token1"
+
+    with ServiceBusClient("mock.servicebus.windows.net", credential) as client:
+        client.get_queue_senders(["mock"])
+        assert client._connection is not None
+
+
+def test_caching_token_credential_fetches_outside_lock():
+    credential = BlockingMockCredential()
+    caching_credential = _CachingTokenCredential(credential)
+    cached = caching_credential.get_token("scope")
+    credential.event.clear()
+    fetching = threading.Thread(target=caching_credential.get_token, args=("slow scope",))
+    fetching.start()
+    results = []
+    reading = threading.Thread(target=lambda: results.append(caching_credential.get_token("scope")))
+    try:
+        assert credential.fetching.wait(5)
+        # A cached token is returned while another scope is still being fetched.
+        reading.start()
+        reading.join(5)
+        assert results == [cached]
+    finally:
+        credential.event.set()
+        fetching.join()
+        reading.join()
+    assert len(credential.calls) == 2